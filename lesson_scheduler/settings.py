@@ -49,6 +49,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'schedules.middleware.NPlusOneDetectionMiddleware',
 ]
 
 ROOT_URLCONF = 'lesson_scheduler.urls'
@@ -126,4 +127,68 @@ STATIC_URL = 'static/'
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Django REST framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'schedules.authentication.TeacherTokenAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'schedules.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'schedules.parsers.MessagePackParser',
+    ],
+    # date 객체를 그대로 넘겨 렌더러가 형식을 결정 (JSON은 ISO 문자열, MessagePack은 ordinal)
+    'DATE_FORMAT': None,
+}
+
+
+# Teacher token authentication
+
+TEACHER_TOKEN_MAX_AGE = config('TEACHER_TOKEN_MAX_AGE', default=60 * 60 * 24, cast=int)
+
+REVOKED_TOKENS_CACHE_TIMEOUT = 60
+
+
+# Idempotency-Key (seconds a stored response can be replayed)
+
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24
+IDEMPOTENCY_KEY_LEASE = 60
+
+
+# Write throttling (schedules.throttling)
+# Per-teacher token bucket: WRITE_THROTTLE_CAPACITY tokens, refilled at
+# WRITE_THROTTLE_REFILL_RATE tokens per second; heavy actions cost HEAVY_ACTION_COST.
+# At most HEAVY_ACTION_CONCURRENCY heavy actions run at once, others get 429.
+
+WRITE_THROTTLE_CAPACITY = 30
+
+WRITE_THROTTLE_REFILL_RATE = 0.5
+
+HEAVY_ACTION_COST = 5
+
+HEAVY_ACTION_CONCURRENCY = 4
+
+HEAVY_ACTION_RETRY_AFTER = 1
+
+HEAVY_ACTION_SLOT_TIMEOUT = 60
+
+
+# Query monitoring (schedules.queries)
+# N_PLUS_ONE_DETECTION: 'log', 'raise' or None
+
+N_PLUS_ONE_DETECTION = 'log' if DEBUG else None
+
+N_PLUS_ONE_THRESHOLD = 5
+
+QUERY_BUDGET_ENFORCE = False
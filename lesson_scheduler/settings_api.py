@@ -0,0 +1,43 @@
+"""
+API-only Django settings for lesson_scheduler project.
+
+Serves only the `schedules` JSON/MessagePack API. Admin, sessions, messages,
+static files, templates and the browsable API are left out so that workers
+import less on cold start.
+
+Use with DJANGO_SETTINGS_MODULE=lesson_scheduler.settings_api
+"""
+from .settings import *  # noqa: F401, F403
+from .settings import REST_FRAMEWORK
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'schedules',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'schedules.middleware.NPlusOneDetectionMiddleware',
+]
+
+TEMPLATES = []
+
+
+# Django REST framework (JSON/MessagePack only, no django.contrib.auth user)
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'schedules.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'schedules.parsers.MessagePackParser',
+    ],
+    'UNAUTHENTICATED_USER': None,
+    'TEST_REQUEST_DEFAULT_FORMAT': 'json',
+}
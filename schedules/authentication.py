@@ -0,0 +1,97 @@
+import secrets
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from .models import RevokedToken
+
+TOKEN_KEYWORD = "Token"
+TOKEN_SALT = "schedules.teacher-token"
+REVOKED_TOKENS_CACHE_KEY = "schedules:revoked-tokens"
+
+
+# 토큰에서 복원한 선생님 정보 (DB 조회 없이 id, subject_id만 제공)
+class TokenTeacher:
+    is_authenticated = True
+
+    def __init__(self, id, subject_id, jti):
+        self.id = id
+        self.subject_id = subject_id
+        self.jti = jti
+
+
+def issue_token(teacher):
+    max_age = settings.TEACHER_TOKEN_MAX_AGE
+    claims = {
+        "tid": teacher.id,
+        "sid": teacher.subject_id,
+        "jti": secrets.token_urlsafe(12),
+        "exp": int(time.time()) + max_age,
+    }
+    return signing.dumps(claims, salt=TOKEN_SALT, compress=True)
+
+
+def revoke_token(token):
+    claims = load_token_claims(token)
+    RevokedToken.objects.get_or_create(
+        jti=claims["jti"],
+        defaults={
+            "expires_at": timezone.datetime.fromtimestamp(
+                claims["exp"], tz=timezone.get_current_timezone()
+            )
+        },
+    )
+    cache.delete(REVOKED_TOKENS_CACHE_KEY)
+
+
+# 서명 검증 결과 캐시 (만료, 폐기 여부는 요청마다 별도로 확인)
+@lru_cache(maxsize=4096)
+def load_token_claims(token):
+    try:
+        return signing.loads(token, salt=TOKEN_SALT)
+    except signing.BadSignature:
+        raise AuthenticationFailed({"error": "Invalid token."})
+
+
+def get_revoked_token_ids():
+    def load():
+        return set(
+            RevokedToken.objects.filter(expires_at__gt=timezone.now()).values_list(
+                "jti", flat=True
+            )
+        )
+
+    return cache.get_or_set(
+        REVOKED_TOKENS_CACHE_KEY, load, settings.REVOKED_TOKENS_CACHE_TIMEOUT
+    )
+
+
+class TeacherTokenAuthentication(BaseAuthentication):
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != TOKEN_KEYWORD.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise AuthenticationFailed({"error": "Invalid token header."})
+
+        try:
+            token = auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed({"error": "Invalid token header."})
+
+        claims = load_token_claims(token)
+        if claims["exp"] < time.time():
+            raise AuthenticationFailed({"error": "Token has expired."})
+        if claims["jti"] in get_revoked_token_ids():
+            raise AuthenticationFailed({"error": "Token has been revoked."})
+
+        return TokenTeacher(claims["tid"], claims["sid"], claims["jti"]), token
+
+    def authenticate_header(self, request):
+        return TOKEN_KEYWORD
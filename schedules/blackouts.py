@@ -0,0 +1,56 @@
+from bisect import bisect_right
+from datetime import timedelta
+
+from rest_framework.exceptions import ValidationError
+
+from .constants import BLACKOUT_POLICIES
+
+
+def validate_blackout_policy(policy):
+    if policy not in BLACKOUT_POLICIES:
+        raise ValidationError("Invalid blackout policy. Choose skip or shift.")
+
+
+# 휴일/휴강 기간을 정렬·병합된 구간 목록으로 보관하고 bisect로 날짜를 조회
+class BlackoutCalendar:
+    def __init__(self, ranges=()):
+        merged = []
+        for start_date, end_date in sorted(ranges):
+            # 겹치거나 바로 이어지는 구간은 하나로 병합
+            if merged and start_date <= merged[-1][1] + timedelta(days=1):
+                merged[-1][1] = max(merged[-1][1], end_date)
+            else:
+                merged.append([start_date, end_date])
+        self.starts = [start_date for start_date, _ in merged]
+        self.ends = [end_date for _, end_date in merged]
+
+    def __bool__(self):
+        return bool(self.starts)
+
+    def __contains__(self, day):
+        return self.find(day) is not None
+
+    # day가 포함된 휴강 구간의 마지막 날 (없으면 None)
+    def find(self, day):
+        index = bisect_right(self.starts, day) - 1
+        if index >= 0 and self.ends[index] >= day:
+            return self.ends[index]
+        return None
+
+    # 휴강일에 걸린 날짜를 건너뛰거나(skip) 휴강 다음 날로 미룸(shift)
+    def apply(self, dates, policy, last_date):
+        validate_blackout_policy(policy)
+
+        result = []
+        for day in dates:
+            blackout_end = self.find(day)
+            if blackout_end is not None:
+                if policy != "shift":
+                    continue
+                day = blackout_end + timedelta(days=1)
+                if day > last_date:
+                    continue
+            # 여러 날짜가 같은 날로 미뤄진 경우 한 번만 포함
+            if not result or result[-1] != day:
+                result.append(day)
+        return result
@@ -1,2 +1,23 @@
 # 반복 수업 주기 (2주 혹은 4주)
 FREQUENCY_CHOICES = [2, 4]
+
+# 휴강일에 걸린 반복 수업 처리 방식 (건너뛰기 혹은 휴강 다음 날로 미루기)
+BLACKOUT_POLICIES = ["skip", "shift"]
+
+# 그룹 수업 최대 학생 수와 일괄 생성 시 한 번에 INSERT 할 행 수
+GROUP_LESSON_MAX_STUDENTS = 30
+BULK_CREATE_BATCH_SIZE = 500
+
+# 배치 API에서 실행할 수 있는 조회 action과 최대 요청 수
+BATCH_ACTIONS = ["list", "retrieve", "dashboard"]
+BATCH_MAX_REQUESTS = 20
+
+# MessagePack 응답/요청에서 날짜(day ordinal)를 나타내는 ext 타입 코드
+MSGPACK_DATE_EXT_TYPE = 1
+
+# 쓰기 제한 대상 action, 토큰을 더 소모하고 동시 실행 수가 제한되는 무거운 action
+WRITE_ACTIONS = ["create", "create_repeating", "complete", "destroy"]
+HEAVY_ACTIONS = ["create_repeating"]
+THROTTLE_DECISIONS = ["allowed", "throttled", "shed"]
+# 쓰기 제한을 적용하는 viewset의 basename (action별 통계를 viewset별로 구분)
+THROTTLED_VIEWSETS = ["schedule", "lesson"]
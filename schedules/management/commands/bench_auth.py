@@ -0,0 +1,52 @@
+import timeit
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory
+
+from schedules.authentication import (
+    REVOKED_TOKENS_CACHE_KEY,
+    TeacherTokenAuthentication,
+    issue_token,
+    load_token_claims,
+)
+from schedules.models import Teacher
+
+
+class Command(BaseCommand):
+    help = "Measure per-request authentication overhead."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--number", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        number = options["number"]
+        teacher = Teacher.objects.first()
+        if teacher is None:
+            raise CommandError("At least one teacher is required.")
+
+        token = issue_token(teacher)
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Token {token}")
+        authentication = TeacherTokenAuthentication()
+
+        # 기존 방식: Teacher-ID 헤더로 매 요청마다 Teacher 조회
+        def header_lookup():
+            Teacher.objects.select_related("subject").get(id=teacher.id)
+
+        def token_uncached():
+            load_token_claims.cache_clear()
+            authentication.authenticate(request)
+
+        def token_cached():
+            authentication.authenticate(request)
+
+        cache.delete(REVOKED_TOKENS_CACHE_KEY)
+        authentication.authenticate(request)
+
+        for name, func in [
+            ("Teacher-ID header lookup", header_lookup),
+            ("token (signature verified)", token_uncached),
+            ("token (signature cached)", token_cached),
+        ]:
+            elapsed = timeit.timeit(func, number=number)
+            self.stdout.write(f"{name}: {elapsed / number * 1_000_000:.1f} us/request")
@@ -0,0 +1,48 @@
+import timeit
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from schedules.models import Schedule, Student, Subject, Teacher
+from schedules.renderers import MessagePackRenderer
+from schedules.serializers import ScheduleSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare response size and encode time of JSON and MessagePack."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--schedules", type=int, default=500)
+        parser.add_argument("--number", type=int, default=100)
+
+    def handle(self, *args, **options):
+        number = options["number"]
+        now = timezone.now()
+        subject = Subject(id=1, korean_name="수학", english_name="Math")
+        teacher = Teacher(
+            id=1, user_name="teacher1", human_name="John Doe", subject=subject
+        )
+        student = Student(id=1, user_name="student1", human_name="Jane Doe")
+        schedules = [
+            Schedule(
+                id=i,
+                teacher=teacher,
+                student=student,
+                subject=subject,
+                scheduled_at=(now + timedelta(days=i)).date(),
+                created_at=now,
+                modified_at=now,
+            )
+            for i in range(options["schedules"])
+        ]
+        data = ScheduleSerializer(schedules, many=True).data
+
+        for renderer in [JSONRenderer(), MessagePackRenderer()]:
+            size = len(renderer.render(data))
+            elapsed = timeit.timeit(lambda: renderer.render(data), number=number)
+            self.stdout.write(
+                f"{renderer.media_type}: {size} bytes, "
+                f"{elapsed / number * 1000:.2f} ms/response"
+            )
@@ -0,0 +1,98 @@
+import json
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from schedules.models import Teacher
+
+# 새 프로세스에서 WSGI 앱 로딩과 첫 요청(토큰 인증된 스케줄 목록 조회)까지의 시간 측정
+# 토큰 발급에 쓴 DB 연결은 닫아서 첫 요청이 연결 비용까지 포함하도록 함
+CHILD_SCRIPT = """
+import io, json, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+ready = time.perf_counter()
+from django.db import connections
+from schedules.authentication import issue_token
+from schedules.models import Teacher
+token = issue_token(Teacher.objects.order_by("id").first())
+connections.close_all()
+environ = {
+    "REQUEST_METHOD": "GET", "PATH_INFO": "/api/schedules/",
+    "SERVER_NAME": "localhost", "SERVER_PORT": "80", "HTTP_HOST": "localhost",
+    "HTTP_AUTHORIZATION": "Token " + token,
+    "wsgi.url_scheme": "http", "wsgi.input": io.BytesIO(),
+}
+statuses = []
+request_start = time.perf_counter()
+b"".join(application(environ, lambda status, headers: statuses.append(status)))
+done = time.perf_counter()
+assert statuses == ["200 OK"], statuses
+print(json.dumps({"ready": ready - start, "first_request": done - request_start}))
+"""
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+class Command(BaseCommand):
+    help = "Measure worker cold start: import time and first-request latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles",
+            nargs="+",
+            default=["lesson_scheduler.settings", "lesson_scheduler.settings_api"],
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        if not Teacher.objects.exists():
+            raise CommandError("Create a teacher before running the benchmark.")
+
+        for profile in options["profiles"]:
+            # 시간은 -X importtime 없이 반복 측정한 최솟값, import 통계는 별도 1회 측정
+            runs = [self.run_child(profile) for _ in range(options["repeat"])]
+            ready = min(run["ready"] for run in runs)
+            first_request = min(run["first_request"] for run in runs)
+            modules, imports = self.measure_imports(profile)
+            self.stdout.write(
+                f"{profile}: {modules} modules, "
+                f"importtime {imports * 1000:.1f} ms, "
+                f"app ready {ready * 1000:.1f} ms, "
+                f"first request {first_request * 1000:.1f} ms"
+            )
+
+    def spawn(self, profile, *options):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": profile}
+        return subprocess.run(
+            [sys.executable, *options, "-c", CHILD_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+    def run_child(self, profile):
+        result = self.spawn(profile)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def measure_imports(self, profile):
+        result = self.spawn(profile, "-X", "importtime")
+
+        # 최상위 import(들여쓰기 없음)의 누적 시간 합계 = 전체 import 시간
+        imports = 0
+        modules = 0
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME_LINE.match(line)
+            if match is None:
+                continue
+            modules += 1
+            if not match.group(3):
+                imports += int(match.group(2))
+        return modules, imports / 1_000_000
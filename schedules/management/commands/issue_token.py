@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from schedules.authentication import issue_token
+from schedules.models import Teacher
+
+
+class Command(BaseCommand):
+    help = "Issue a signed authentication token for a teacher."
+
+    def add_arguments(self, parser):
+        parser.add_argument("teacher_id", type=int)
+
+    def handle(self, *args, **options):
+        try:
+            teacher = Teacher.objects.get(id=options["teacher_id"])
+        except Teacher.DoesNotExist:
+            raise CommandError("Invalid teacher id.")
+
+        self.stdout.write(issue_token(teacher))
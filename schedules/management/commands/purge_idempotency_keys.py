@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from schedules.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete stored Idempotency-Key responses older than IDEMPOTENCY_KEY_TTL."
+
+    def handle(self, *args, **options):
+        expires_before = timezone.now() - timedelta(
+            seconds=settings.IDEMPOTENCY_KEY_TTL
+        )
+        deleted, _ = IdempotencyKey.objects.filter(
+            created_at__lt=expires_before
+        ).delete()
+        self.stdout.write(f"{deleted} idempotency keys deleted.")
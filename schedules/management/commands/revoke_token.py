@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import AuthenticationFailed
+
+from schedules.authentication import revoke_token
+
+
+class Command(BaseCommand):
+    help = "Revoke a teacher authentication token before it expires."
+
+    def add_arguments(self, parser):
+        parser.add_argument("token")
+
+    def handle(self, *args, **options):
+        try:
+            revoke_token(options["token"])
+        except AuthenticationFailed:
+            raise CommandError("Invalid token.")
+
+        self.stdout.write("Token revoked.")
@@ -0,0 +1,25 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from schedules.throttling import get_throttle_metrics
+
+
+class Command(BaseCommand):
+    help = "Show write throttling decisions per viewset and action (shared cache only)."
+
+    def handle(self, *args, **options):
+        # 프로세스별 캐시에 쌓인 통계는 다른 프로세스(이 명령어)에서 읽을 수 없음
+        if isinstance(caches["default"], (LocMemCache, DummyCache)):
+            raise CommandError(
+                "Throttle metrics are stored per process with the configured cache "
+                "backend. Configure a shared cache (e.g. Redis, Memcached) in CACHES."
+            )
+
+        for basename, actions in get_throttle_metrics().items():
+            for action, decisions in actions.items():
+                counts = ", ".join(
+                    f"{decision} {count}" for decision, count in decisions.items()
+                )
+                self.stdout.write(f"{basename} {action}: {counts}")
@@ -0,0 +1,28 @@
+from django.conf import settings
+
+from .queries import NPlusOneDetected, logger, record_queries
+
+
+# 요청 하나에서 같은 형태의 쿼리가 N_PLUS_ONE_THRESHOLD번 이상 실행되면 로그 혹은 예외
+class NPlusOneDetectionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = settings.N_PLUS_ONE_DETECTION
+        if not mode:
+            return self.get_response(request)
+
+        with record_queries(settings.N_PLUS_ONE_THRESHOLD) as recorder:
+            response = self.get_response(request)
+
+        for shape, stack in recorder.stacks.items():
+            message = (
+                f"Repeated query ({recorder.shapes[shape]} times) in "
+                f"{request.method} {request.path}: {shape}\n{stack}"
+            )
+            if mode == "raise":
+                raise NPlusOneDetected(message)
+            logger.warning(message)
+
+        return response
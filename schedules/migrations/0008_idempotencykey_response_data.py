@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-19 20:03
+
+import schedules.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0007_blackout'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='idempotencykey',
+            name='response_data',
+            field=models.JSONField(blank=True, decoder=schedules.models.ResponseDataDecoder, encoder=schedules.models.ResponseDataEncoder, null=True),
+        ),
+    ]
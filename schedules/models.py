@@ -1,10 +1,55 @@
-from datetime import timedelta
+import json
+from datetime import date, datetime, timedelta
 
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import Q
 from django.utils import timezone
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 
-from .constants import FREQUENCY_CHOICES
+from .constants import (
+    BULK_CREATE_BATCH_SIZE,
+    FREQUENCY_CHOICES,
+    GROUP_LESSON_MAX_STUDENTS,
+)
+from .blackouts import BlackoutCalendar, validate_blackout_policy
+from .exceptions import PreconditionFailed
+
+
+# ISO 문자열 혹은 date(MessagePack 요청) 형식의 날짜를 datetime으로 변환
+def to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    return datetime.fromisoformat(value)
+
+
+# 반복 수업 날짜 목록 계산
+def get_repeating_dates(start_date, end_date, frequency):
+    try:
+        start_date = timezone.make_aware(to_datetime(start_date))
+        end_date = timezone.make_aware(to_datetime(end_date))
+    except (TypeError, ValueError):
+        raise ValidationError("Invalid date format. Use ISO format (YYYY-MM-DD).")
+
+    if start_date > end_date:
+        raise ValidationError("Start date cannot be later then end date.")
+
+    if end_date > timezone.now() + timedelta(days=365):
+        raise ValidationError("End date cannot be more than 1 year from today.")
+
+    if frequency in FREQUENCY_CHOICES:
+        delta = timedelta(weeks=frequency)
+    else:
+        raise ValidationError("Invalid frequency. Choose either 2 or 4 weeks.")
+
+    dates = []
+    current_date = start_date
+    while current_date <= end_date:
+        dates.append(current_date.date())
+        current_date += delta
+    return dates
 
 
 class User(models.Model):
@@ -33,7 +78,278 @@ class Student(User):
     pass
 
 
+class RevokedToken(models.Model):
+    jti = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+# 재생(replay) 응답에서 date/datetime 타입을 유지하도록 태그를 붙여 저장
+class ResponseDataEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        if isinstance(o, datetime):
+            return {"__datetime__": o.isoformat()}
+        if isinstance(o, date):
+            return {"__date__": o.isoformat()}
+        return super().default(o)
+
+
+class ResponseDataDecoder(json.JSONDecoder):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, object_hook=self.decode_tagged, **kwargs)
+
+    @staticmethod
+    def decode_tagged(obj):
+        if obj.keys() == {"__datetime__"}:
+            return datetime.fromisoformat(obj["__datetime__"])
+        if obj.keys() == {"__date__"}:
+            return date.fromisoformat(obj["__date__"])
+        return obj
+
+
+class IdempotencyKey(models.Model):
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_data = models.JSONField(
+        null=True,
+        blank=True,
+        encoder=ResponseDataEncoder,
+        decoder=ResponseDataDecoder,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("teacher", "key")
+
+
+# 휴강 기간 (teacher, student 모두 비어 있으면 전체 휴강)
+class Blackout(models.Model):
+    teacher = models.ForeignKey(
+        Teacher, on_delete=models.CASCADE, null=True, blank=True
+    )
+    student = models.ForeignKey(
+        Student, on_delete=models.CASCADE, null=True, blank=True
+    )
+    start_date = models.DateField()
+    end_date = models.DateField()
+    reason = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    modified_at = models.DateTimeField(auto_now=True)
+
+    # 기간 내 휴강을 한 번에 조회해 (공통 구간, 학생별 구간)으로 분류
+    @classmethod
+    def load_ranges(cls, teacher_id, student_ids, start_date, end_date):
+        shared_ranges = []
+        student_ranges = {student_id: [] for student_id in student_ids}
+        blackouts = Blackout.objects.filter(
+            Q(teacher__isnull=True) | Q(teacher_id=teacher_id),
+            Q(student__isnull=True) | Q(student_id__in=student_ids),
+            start_date__lte=end_date,
+            end_date__gte=start_date,
+        ).values_list("student_id", "start_date", "end_date")
+
+        for student_id, blackout_start, blackout_end in blackouts:
+            if student_id is None:
+                shared_ranges.append((blackout_start, blackout_end))
+            else:
+                student_ranges[student_id].append((blackout_start, blackout_end))
+        return shared_ranges, student_ranges
+
+
+class Lesson(models.Model):
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE)
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
+    scheduled_at = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    modified_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def create_lesson(cls, teacher_id, student_ids, subject_id, scheduled_at):
+        try:
+            scheduled_at = to_datetime(scheduled_at).date()
+        except (TypeError, ValueError):
+            raise ValidationError("Invalid date format. Use ISO format (YYYY-MM-DD).")
+
+        return cls.create_lessons(teacher_id, student_ids, subject_id, [scheduled_at])
+
+    @classmethod
+    def create_repeating_lessons(
+        cls,
+        teacher_id,
+        student_ids,
+        subject_id,
+        start_date,
+        end_date,
+        frequency,
+        blackout_policy="skip",
+    ):
+        dates = get_repeating_dates(start_date, end_date, frequency)
+        validate_blackout_policy(blackout_policy)
+
+        # 공통 휴강은 수업 날짜 자체를 건너뛰거나 미루고, 학생별 휴강은 해당 학생만 제외
+        last_date = to_datetime(end_date).date()
+        shared_ranges, student_ranges = Blackout.load_ranges(
+            teacher_id, student_ids, dates[0], last_date
+        )
+        dates = BlackoutCalendar(shared_ranges).apply(dates, blackout_policy, last_date)
+        if not dates:
+            raise ValidationError("All dates fall on blackout days.")
+
+        blocked = set()
+        for student_id, ranges in student_ranges.items():
+            calendar = BlackoutCalendar(ranges)
+            if calendar:
+                blocked.update(
+                    (scheduled_at, student_id)
+                    for scheduled_at in dates
+                    if scheduled_at in calendar
+                )
+        if student_ids and all(
+            (scheduled_at, student_id) in blocked
+            for scheduled_at in dates
+            for student_id in student_ids
+        ):
+            raise ValidationError("All dates fall on blackout days.")
+
+        return cls.create_lessons(teacher_id, student_ids, subject_id, dates, blocked)
+
+    # 그룹 수업 생성: (날짜 x 학생) 조합을 한 번의 조회로 충돌 검사 후 일괄 생성
+    @classmethod
+    def create_lessons(cls, teacher_id, student_ids, subject_id, dates, blocked=()):
+        if not student_ids:
+            raise ValidationError("At least one student is required.")
+        if len(student_ids) > GROUP_LESSON_MAX_STUDENTS:
+            raise ValidationError(
+                f"Group lessons cannot have more than "
+                f"{GROUP_LESSON_MAX_STUDENTS} students."
+            )
+        if Student.objects.filter(id__in=student_ids).count() != len(student_ids):
+            raise ValidationError("Invalid student id.")
+
+        existing_schedules = set(blocked)
+        existing_schedules.update(
+            Schedule.objects.filter(
+                teacher_id=teacher_id,
+                student_id__in=student_ids,
+                scheduled_at__in=dates,
+            ).values_list("scheduled_at", "student_id")
+        )
+
+        attendees_by_date = {}
+        for scheduled_at in dates:
+            attendees = [
+                student_id
+                for student_id in student_ids
+                if (scheduled_at, student_id) not in existing_schedules
+            ]
+            if attendees:
+                attendees_by_date[scheduled_at] = attendees
+
+        if not attendees_by_date:
+            raise ValidationError("These schedules already exist.")
+
+        now = timezone.now()
+        with transaction.atomic():
+            lessons = Lesson.objects.bulk_create(
+                [
+                    Lesson(
+                        teacher_id=teacher_id,
+                        subject_id=subject_id,
+                        scheduled_at=scheduled_at,
+                        created_at=now,
+                        modified_at=now,
+                    )
+                    for scheduled_at in attendees_by_date
+                ],
+                batch_size=BULK_CREATE_BATCH_SIZE,
+            )
+            Schedule.objects.bulk_create(
+                [
+                    Schedule(
+                        lesson=lesson,
+                        teacher_id=teacher_id,
+                        student_id=student_id,
+                        subject_id=subject_id,
+                        scheduled_at=lesson.scheduled_at,
+                        created_at=now,
+                        modified_at=now,
+                    )
+                    for lesson in lessons
+                    for student_id in attendees_by_date[lesson.scheduled_at]
+                ],
+                batch_size=BULK_CREATE_BATCH_SIZE,
+            )
+
+        return [
+            {
+                "id": lesson.id,
+                "scheduled_at": lesson.scheduled_at,
+                "student_ids": attendees_by_date[lesson.scheduled_at],
+            }
+            for lesson in lessons
+        ]
+
+    # 출석 학생별 완료 처리 (student_ids가 None이면 전체 학생)
+    @classmethod
+    def complete_attendees(cls, lesson_id, teacher_id, student_ids=None):
+        completed_at = timezone.now()
+        queryset = Schedule.objects.filter(
+            lesson_id=lesson_id, teacher_id=teacher_id, is_complete=False
+        )
+        if student_ids is not None:
+            queryset = queryset.filter(student_id__in=student_ids)
+
+        # 수업에 참여하지 않는 학생이 포함되면 전체 요청을 롤백
+        with transaction.atomic():
+            updated = queryset.update(
+                is_complete=True,
+                completed_date=completed_at.date(),
+                modified_at=completed_at,
+            )
+            if updated and (student_ids is None or updated == len(student_ids)):
+                return updated
+
+            if not updated:
+                lesson = (
+                    Lesson.objects.filter(id=lesson_id).values("teacher_id").first()
+                )
+                if lesson is None:
+                    raise NotFound({"error": "Lesson not found."})
+                if lesson["teacher_id"] != teacher_id:
+                    raise PermissionDenied({"error": "Permission denied"})
+
+            if student_ids is not None:
+                attendee_ids = set(
+                    Schedule.objects.filter(
+                        lesson_id=lesson_id, student_id__in=student_ids
+                    ).values_list("student_id", flat=True)
+                )
+                non_attendee_ids = [
+                    student_id
+                    for student_id in student_ids
+                    if student_id not in attendee_ids
+                ]
+                if non_attendee_ids:
+                    raise ValidationError(
+                        f"Students {non_attendee_ids} are not attendees "
+                        f"of this lesson."
+                    )
+
+            if updated:
+                return updated
+        raise ValidationError("Attendees are already completed.")
+
+
 class Schedule(models.Model):
+    lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="attendees",
+    )
     teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE)
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
@@ -60,68 +376,105 @@ class Schedule(models.Model):
 
     @classmethod
     def create_repeating_schedules(
-        cls, teacher_id, student_id, subject_id, start_date, end_date, frequency
+        cls,
+        teacher_id,
+        student_id,
+        subject_id,
+        start_date,
+        end_date,
+        frequency,
+        blackout_policy="skip",
     ):
-        try:
-            start_date = timezone.make_aware(
-                timezone.datetime.fromisoformat(start_date)
-            )
-            end_date = timezone.make_aware(timezone.datetime.fromisoformat(end_date))
-        except ValueError:
-            raise ValidationError("Invalid date format. Use ISO format (YYYY-MM-DD).")
-
-        if start_date > end_date:
-            raise ValidationError("Start date cannot be later then end date.")
+        dates = get_repeating_dates(start_date, end_date, frequency)
+        validate_blackout_policy(blackout_policy)
 
-        if end_date > timezone.now() + timedelta(days=365):
-            raise ValidationError("End date cannot be more than 1 year from today.")
-
-        existing_schedules = Schedule.objects.filter(
-            teacher_id=teacher_id,
-            student_id=student_id,
-            scheduled_at__range=[start_date, end_date],
-        ).values_list("scheduled_at", flat=True)
-
-        if frequency in FREQUENCY_CHOICES:
-            delta = timedelta(weeks=frequency)
-        else:
-            raise ValidationError("Invalid frequency. Choose either 2 or 4 weeks.")
+        last_date = to_datetime(end_date).date()
+        shared_ranges, student_ranges = Blackout.load_ranges(
+            teacher_id, [student_id], dates[0], last_date
+        )
+        calendar = BlackoutCalendar(shared_ranges + student_ranges[student_id])
+        dates = calendar.apply(dates, blackout_policy, last_date)
+        if not dates:
+            raise ValidationError("All dates fall on blackout days.")
 
-        current_date = start_date
+        existing_schedules = set(
+            Schedule.objects.filter(
+                teacher_id=teacher_id,
+                student_id=student_id,
+                scheduled_at__in=dates,
+            ).values_list("scheduled_at", flat=True)
+        )
 
         schedules_to_create = []
         created_schedules = []
-        while current_date <= end_date:
-            if current_date.date() not in existing_schedules:
+        for scheduled_at in dates:
+            if scheduled_at not in existing_schedules:
                 schedules_to_create.append(
                     Schedule(
                         teacher_id=teacher_id,
                         student_id=student_id,
                         subject_id=subject_id,
-                        scheduled_at=current_date.date(),
+                        scheduled_at=scheduled_at,
                         created_at=timezone.now(),
                         modified_at=timezone.now(),
                     )
                 )
-                created_schedules.append(current_date.date())
-            current_date += delta
+                created_schedules.append(scheduled_at)
 
         if schedules_to_create:
             Schedule.objects.bulk_create(schedules_to_create)
 
         return created_schedules
 
-    def mark_as_complete(self):
-        if self.is_complete:
-            raise ValidationError("Schedule is already completed.")
-        self.is_complete = True
-        self.completed_date = timezone.now().date()
-        self.save()
-
-    def delete_schedule(self):
-        if self.is_complete:
-            raise ValidationError("Completed schedules cannot be deleted.")
-        self.delete()
+    # 조건부 쓰기: 완료 여부, 권한, If-Match 버전을 하나의 UPDATE/DELETE 조건으로 검사
+    @classmethod
+    def writable_schedules(cls, schedule_id, teacher_id, versions=None):
+        queryset = Schedule.objects.filter(
+            id=schedule_id, teacher_id=teacher_id, is_complete=False
+        )
+        if versions is not None:
+            queryset = queryset.filter(modified_at__in=versions)
+        return queryset
+
+    @classmethod
+    def raise_write_conflict(cls, schedule_id, teacher_id, versions, message):
+        schedule = (
+            Schedule.objects.filter(id=schedule_id)
+            .values("teacher_id", "is_complete", "modified_at")
+            .first()
+        )
+        if schedule is None:
+            raise NotFound({"error": "Schedule not found."})
+        if schedule["teacher_id"] != teacher_id:
+            raise PermissionDenied({"error": "Permission denied"})
+        if versions is not None and schedule["modified_at"] not in versions:
+            raise PreconditionFailed({"error": "Schedule has been modified."})
+        raise ValidationError(message)
+
+    @classmethod
+    def complete_schedule(cls, schedule_id, teacher_id, versions=None):
+        completed_at = timezone.now()
+        updated = cls.writable_schedules(schedule_id, teacher_id, versions).update(
+            is_complete=True,
+            completed_date=completed_at.date(),
+            modified_at=completed_at,
+        )
+        if not updated:
+            cls.raise_write_conflict(
+                schedule_id, teacher_id, versions, "Schedule is already completed."
+            )
+        return completed_at
+
+    @classmethod
+    def delete_schedule(cls, schedule_id, teacher_id, versions=None):
+        deleted, _ = cls.writable_schedules(schedule_id, teacher_id, versions).delete()
+        if not deleted:
+            cls.raise_write_conflict(
+                schedule_id,
+                teacher_id,
+                versions,
+                "Completed schedules cannot be deleted.",
+            )
 
     class Meta:
         unique_together = ("teacher", "student", "scheduled_at")
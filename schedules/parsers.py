@@ -0,0 +1,28 @@
+from datetime import date
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from .constants import MSGPACK_DATE_EXT_TYPE
+
+
+def decode_msgpack_ext(code, data):
+    import msgpack
+
+    if code == MSGPACK_DATE_EXT_TYPE:
+        return date.fromordinal(msgpack.unpackb(data))
+    return msgpack.ExtType(code, data)
+
+
+class MessagePackParser(BaseParser):
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        import msgpack
+
+        try:
+            return msgpack.unpackb(
+                stream.read(), ext_hook=decode_msgpack_ext, raw=False
+            )
+        except (ValueError, TypeError, OverflowError) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
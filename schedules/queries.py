@@ -0,0 +1,92 @@
+import logging
+import re
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# IN (%s, %s, ...) 처럼 파라미터 개수만 다른 쿼리는 같은 형태로 취급
+PLACEHOLDER_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)")
+SAVEPOINT_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class NPlusOneDetected(Exception):
+    pass
+
+
+# 실행된 쿼리 수와 형태별 반복 횟수 기록 (트랜잭션 savepoint 제외)
+class QueryRecorder:
+    def __init__(self, threshold=None):
+        self.threshold = threshold
+        self.count = 0
+        self.shapes = Counter()
+        self.stacks = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(SAVEPOINT_PREFIXES):
+            shape = PLACEHOLDER_LIST.sub("(%s, ...)", sql)
+            self.count += 1
+            self.shapes[shape] += 1
+            if self.threshold and self.shapes[shape] == self.threshold:
+                self.stacks[shape] = "".join(traceback.format_stack()[:-1])
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def record_queries(threshold=None):
+    recorder = QueryRecorder(threshold)
+    with connection.execute_wrapper(recorder):
+        yield recorder
+
+
+# 배치 하위 요청처럼 독립된 처리 단위에서는 쿼리 형태별 반복 횟수를 따로 집계
+@contextmanager
+def separate_query_shapes():
+    recorders = [
+        wrapper
+        for wrapper in connection.execute_wrappers
+        if isinstance(wrapper, QueryRecorder) and wrapper.threshold
+    ]
+    outer_shapes = [recorder.shapes for recorder in recorders]
+    for recorder in recorders:
+        recorder.shapes = Counter()
+    try:
+        yield
+    finally:
+        for recorder, shapes in zip(recorders, outer_shapes):
+            # 하위 단위 안에서 감지된 형태는 감지 당시 횟수를 유지
+            for shape in recorder.stacks:
+                shapes[shape] = max(shapes[shape], recorder.shapes[shape])
+            recorder.shapes = shapes
+
+
+# ViewSet action의 쿼리 수 상한 (QUERY_BUDGET_ENFORCE가 켜져 있으면 예외, 아니면 로그)
+def query_budget(budget):
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(self, request, *args, **kwargs):
+            with record_queries() as recorder:
+                response = view_func(self, request, *args, **kwargs)
+
+            if recorder.count > budget:
+                message = (
+                    f"{view_func.__qualname__} executed {recorder.count} queries "
+                    f"(budget: {budget})."
+                )
+                if settings.QUERY_BUDGET_ENFORCE:
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return response
+
+        return _wrapped_view
+
+    return decorator
@@ -0,0 +1,31 @@
+from datetime import date, datetime
+
+from rest_framework.renderers import BaseRenderer
+
+from .constants import MSGPACK_DATE_EXT_TYPE
+
+
+# date는 일(day) 서수(ordinal)를 담은 ext 타입으로 인코딩
+def encode_msgpack_default(obj):
+    import msgpack
+
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, date):
+        return msgpack.ExtType(MSGPACK_DATE_EXT_TYPE, msgpack.packb(obj.toordinal()))
+    return str(obj)
+
+
+# msgpack은 MessagePack 요청이 처음 들어올 때 import (JSON만 쓰는 워커의 기동 시간 단축)
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import msgpack
+
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encode_msgpack_default, use_bin_type=True)
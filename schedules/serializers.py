@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from .models import Schedule, Student, Subject, Teacher
+from .models import Blackout, Lesson, Schedule, Student, Subject, Teacher
 
 
 class TeacherSerializer(serializers.ModelSerializer):
@@ -39,3 +39,42 @@ class ScheduleSerializer(serializers.ModelSerializer):
             "created_at",
             "modified_at",
         ]
+
+
+class AttendeeSerializer(serializers.ModelSerializer):
+    student = StudentSerializer()
+
+    class Meta:
+        model = Schedule
+        fields = ["id", "student", "is_complete", "completed_date"]
+
+
+class LessonSerializer(serializers.ModelSerializer):
+    teacher = TeacherSerializer()
+    subject = SubjectSerializer()
+    attendees = AttendeeSerializer(many=True)
+
+    class Meta:
+        model = Lesson
+        fields = [
+            "id",
+            "teacher",
+            "subject",
+            "attendees",
+            "scheduled_at",
+            "created_at",
+            "modified_at",
+        ]
+
+
+class BlackoutSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Blackout
+        fields = ["id", "student", "start_date", "end_date", "reason"]
+
+    def validate(self, data):
+        if data["start_date"] > data["end_date"]:
+            raise serializers.ValidationError(
+                "Start date cannot be later then end date."
+            )
+        return data
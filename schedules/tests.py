@@ -1,13 +1,43 @@
-from datetime import timedelta
+from datetime import date, timedelta
+from unittest import mock
 
+import msgpack
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.test import APITestCase
 
-from .models import Schedule, Student, Subject, Teacher
+from .authentication import get_revoked_token_ids, issue_token, revoke_token
+from .blackouts import BlackoutCalendar
+from .constants import BATCH_MAX_REQUESTS, MSGPACK_DATE_EXT_TYPE
+from .models import (
+    Blackout,
+    IdempotencyKey,
+    Lesson,
+    Schedule,
+    Student,
+    Subject,
+    Teacher,
+)
+from .parsers import decode_msgpack_ext
+from .queries import (
+    NPlusOneDetected,
+    QueryBudgetExceeded,
+    query_budget,
+    record_queries,
+)
+from .renderers import MessagePackRenderer
+from .throttling import HEAVY_SLOT_CACHE_KEY, get_throttle_metrics
+from .views import ScheduleViewSet
+from .utils import make_etag
 
 
+@override_settings(N_PLUS_ONE_DETECTION="raise", QUERY_BUDGET_ENFORCE=True)
 class ScheduleViewSetTest(APITestCase):
 
     def setUp(self):
@@ -23,7 +53,10 @@ class ScheduleViewSetTest(APITestCase):
         )
         self.schedule_url = reverse("schedule-list")
 
-        self.client.credentials(HTTP_TEACHER_ID=self.teacher.id)
+        cache.clear()
+
+        self.token = issue_token(self.teacher)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
 
     def test_create_schedule(self):
         data = {
@@ -137,3 +170,841 @@ class ScheduleViewSetTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(len(response.data["dates"]), 5)
         self.assertEqual(Schedule.objects.count(), 5)
+
+    def test_retrieve_schedule_etag(self):
+        schedule = Schedule.objects.create(
+            teacher=self.teacher,
+            student=self.student,
+            subject=self.subject,
+            scheduled_at=(timezone.now() + timedelta(days=7)).date(),
+        )
+        url = reverse("schedule-detail", kwargs={"pk": schedule.id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["ETag"], make_etag(schedule.modified_at))
+
+    def test_complete_schedule_with_if_match(self):
+        schedule = Schedule.objects.create(
+            teacher=self.teacher,
+            student=self.student,
+            subject=self.subject,
+            scheduled_at=(timezone.now() + timedelta(days=7)).date(),
+        )
+        url = reverse("schedule-complete", kwargs={"pk": schedule.id})
+        etag = make_etag(schedule.modified_at)
+        response = self.client.patch(url, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        schedule.refresh_from_db()
+        self.assertTrue(schedule.is_complete)
+        self.assertEqual(response["ETag"], make_etag(schedule.modified_at))
+
+        # 같은 ETag로 다시 요청하면 이미 변경된 상태이므로 412
+        response = self.client.patch(url, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_complete_completed_schedule(self):
+        schedule = Schedule.objects.create(
+            teacher=self.teacher,
+            student=self.student,
+            subject=self.subject,
+            scheduled_at=(timezone.now() + timedelta(days=7)).date(),
+            is_complete=True,
+            completed_date=timezone.now().date(),
+        )
+        url = reverse("schedule-complete", kwargs={"pk": schedule.id})
+        response = self.client.patch(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_delete_schedule_with_stale_if_match(self):
+        schedule = Schedule.objects.create(
+            teacher=self.teacher,
+            student=self.student,
+            subject=self.subject,
+            scheduled_at=(timezone.now() + timedelta(days=7)).date(),
+        )
+        url = reverse("schedule-detail", kwargs={"pk": schedule.id})
+        stale_etag = make_etag(schedule.modified_at - timedelta(seconds=1))
+        response = self.client.delete(url, HTTP_IF_MATCH=stale_etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(Schedule.objects.count(), 1)
+
+    def test_delete_schedule_without_permission(self):
+        another_teacher = Teacher.objects.create(
+            user_name="teacher2",
+            human_name="Alice",
+            password="password123",
+            subject=self.subject,
+        )
+        schedule = Schedule.objects.create(
+            teacher=another_teacher,
+            student=self.student,
+            subject=self.subject,
+            scheduled_at=(timezone.now() + timedelta(days=7)).date(),
+        )
+        url = reverse("schedule-detail", kwargs={"pk": schedule.id})
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Schedule.objects.count(), 1)
+
+    def test_request_without_token(self):
+        self.client.credentials()
+        response = self.client.get(reverse("schedule-dashboard"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_request_with_invalid_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}x")
+        response = self.client.get(reverse("schedule-dashboard"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TEACHER_TOKEN_MAX_AGE=-1)
+    def test_request_with_expired_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {issue_token(self.teacher)}")
+        response = self.client.get(reverse("schedule-dashboard"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_request_with_revoked_token(self):
+        response = self.client.get(reverse("schedule-dashboard"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        revoke_token(self.token)
+        response = self.client.get(reverse("schedule-dashboard"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_batch_requests(self):
+        schedule = Schedule.objects.create(
+            teacher=self.teacher,
+            student=self.student,
+            subject=self.subject,
+            scheduled_at=timezone.now().date(),
+        )
+        today = timezone.now().date()
+        data = {
+            "requests": [
+                {
+                    "action": "dashboard",
+                    "params": {"year": today.year, "month": today.month},
+                },
+                {
+                    "action": "list",
+                    "params": {
+                        "date_from": today.isoformat(),
+                        "date_to": today.isoformat(),
+                    },
+                },
+                {"action": "retrieve", "id": schedule.id},
+                {"action": "retrieve", "id": schedule.id + 1},
+                {"action": "retrieve", "id": 10**30},
+                {"action": "destroy", "id": schedule.id},
+            ]
+        }
+        url = reverse("schedule-batch")
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        dashboard, listing, retrieve, missing, overflow, destroy = response.data[
+            "responses"
+        ]
+        self.assertEqual(dashboard["data"], {today.strftime("%Y-%m-%d"): 1})
+        self.assertEqual(len(listing["data"]), 1)
+        self.assertEqual(retrieve["data"]["id"], schedule.id)
+        self.assertEqual(retrieve["etag"], make_etag(schedule.modified_at))
+        self.assertEqual(missing["status"], status.HTTP_404_NOT_FOUND)
+        self.assertEqual(overflow["status"], status.HTTP_404_NOT_FOUND)
+        self.assertEqual(destroy["status"], status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Schedule.objects.count(), 1)
+
+    def test_batch_requests_retrieve_single_query(self):
+        schedules = [
+            Schedule.objects.create(
+                teacher=self.teacher,
+                student=self.student,
+                subject=self.subject,
+                scheduled_at=(timezone.now() + timedelta(days=days)).date(),
+            )
+            for days in range(6)
+        ]
+        data = {
+            "requests": [
+                {"action": "retrieve", "id": schedule.id} for schedule in schedules
+            ]
+        }
+        url = reverse("schedule-batch")
+        get_revoked_token_ids()
+        with self.assertNumQueries(3):
+            response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [sub_response["data"]["id"] for sub_response in response.data["responses"]],
+            [schedule.id for schedule in schedules],
+        )
+
+    def test_batch_requests_repeated_actions(self):
+        today = timezone.now().date()
+        data = {
+            "requests": [
+                {
+                    "action": "list",
+                    "params": {
+                        "date_from": (today + timedelta(days=days)).isoformat(),
+                        "date_to": (today + timedelta(days=days)).isoformat(),
+                    },
+                }
+                for days in range(settings.N_PLUS_ONE_THRESHOLD)
+            ]
+            + [{"action": "dashboard"}] * settings.N_PLUS_ONE_THRESHOLD
+        }
+        url = reverse("schedule-batch")
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {sub_response["status"] for sub_response in response.data["responses"]},
+            {status.HTTP_200_OK},
+        )
+
+    def test_batch_requests_invalid_params(self):
+        data = {
+            "requests": [
+                {"action": "list", "params": {"date_from": "x"}},
+                {"action": "dashboard"},
+            ]
+        }
+        url = reverse("schedule-batch")
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        invalid, dashboard = response.data["responses"]
+        self.assertEqual(invalid["status"], status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(dashboard["status"], status.HTTP_200_OK)
+
+    def test_batch_requests_too_many(self):
+        data = {"requests": [{"action": "dashboard"}] * (BATCH_MAX_REQUESTS + 1)}
+        url = reverse("schedule-batch")
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_schedules_msgpack(self):
+        schedule = Schedule.objects.create(
+            teacher=self.teacher,
+            student=self.student,
+            subject=self.subject,
+            scheduled_at=timezone.now().date(),
+        )
+        response = self.client.get(
+            self.schedule_url, HTTP_ACCEPT="application/msgpack"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+
+        data = msgpack.unpackb(response.content, ext_hook=decode_msgpack_ext)
+        self.assertEqual(data[0]["id"], schedule.id)
+        self.assertEqual(data[0]["scheduled_at"], schedule.scheduled_at)
+
+    def test_list_schedules_json_dates(self):
+        schedule = Schedule.objects.create(
+            teacher=self.teacher,
+            student=self.student,
+            subject=self.subject,
+            scheduled_at=timezone.now().date(),
+        )
+        response = self.client.get(self.schedule_url)
+        self.assertEqual(
+            response.json()[0]["scheduled_at"], schedule.scheduled_at.isoformat()
+        )
+
+    def test_create_repeating_schedule_msgpack(self):
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_id": self.student.id,
+            "start_date": timezone.now().date(),
+            "end_date": (timezone.now() + timedelta(weeks=8)).date(),
+            "frequency": 2,
+        }
+        url = reverse("schedule-create-repeating")
+        response = self.client.post(
+            url,
+            MessagePackRenderer().render(data),
+            content_type="application/msgpack",
+            HTTP_ACCEPT="application/msgpack",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        dates = msgpack.unpackb(response.content, ext_hook=decode_msgpack_ext)["dates"]
+        self.assertEqual(dates[0], data["start_date"])
+        self.assertEqual(len(dates), 5)
+        self.assertEqual(Schedule.objects.count(), 5)
+
+    def test_create_repeating_schedule_msgpack_invalid_ordinal(self):
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_id": self.student.id,
+            "start_date": msgpack.ExtType(
+                MSGPACK_DATE_EXT_TYPE, msgpack.packb(10**12)
+            ),
+            "end_date": timezone.now().date(),
+            "frequency": 2,
+        }
+        url = reverse("schedule-create-repeating")
+        response = self.client.post(
+            url, MessagePackRenderer().render(data), content_type="application/msgpack"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_schedule_idempotency_key(self):
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_id": self.student.id,
+            "scheduled_at": (timezone.now() + timedelta(days=7)).date(),
+        }
+        response = self.client.post(self.schedule_url, data, HTTP_IDEMPOTENCY_KEY="a")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        get_revoked_token_ids()
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                self.schedule_url, data, HTTP_IDEMPOTENCY_KEY="a"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response["Idempotent-Replayed"], "true")
+        self.assertEqual(Schedule.objects.count(), 1)
+
+        data["student_id"] = self.student.id + 1
+        response = self.client.post(self.schedule_url, data, HTTP_IDEMPOTENCY_KEY="a")
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_create_repeating_schedule_idempotency_key_msgpack(self):
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_id": self.student.id,
+            "start_date": timezone.now().date(),
+            "end_date": (timezone.now() + timedelta(weeks=8)).date(),
+            "frequency": 2,
+        }
+        url = reverse("schedule-create-repeating")
+        responses = [
+            self.client.post(
+                url,
+                MessagePackRenderer().render(data),
+                content_type="application/msgpack",
+                HTTP_ACCEPT="application/msgpack",
+                HTTP_IDEMPOTENCY_KEY="m",
+            )
+            for _ in range(2)
+        ]
+        self.assertEqual(responses[1]["Idempotent-Replayed"], "true")
+
+        first, replayed = (
+            msgpack.unpackb(response.content, ext_hook=decode_msgpack_ext)
+            for response in responses
+        )
+        self.assertEqual(replayed, first)
+        self.assertEqual(replayed["dates"][0], data["start_date"])
+
+    def test_create_repeating_schedule_idempotency_key_expired(self):
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_id": self.student.id,
+            "start_date": timezone.now().date().isoformat(),
+            "end_date": (timezone.now() + timedelta(weeks=8)).date().isoformat(),
+            "frequency": 2,
+        }
+        url = reverse("schedule-create-repeating")
+        response = self.client.post(url, data, HTTP_IDEMPOTENCY_KEY="b")
+        self.assertEqual(len(response.data["dates"]), 5)
+
+        response = self.client.post(url, data, HTTP_IDEMPOTENCY_KEY="b")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["dates"]), 5)
+
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        response = self.client.post(url, data, HTTP_IDEMPOTENCY_KEY="b")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["dates"], [])
+        self.assertEqual(Schedule.objects.count(), 5)
+
+    def test_create_schedule_idempotency_key_abandoned(self):
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_id": self.student.id,
+            "scheduled_at": (timezone.now() + timedelta(days=7)).date(),
+        }
+        self.client.post(self.schedule_url, data, HTTP_IDEMPOTENCY_KEY="d")
+        # 응답을 저장하기 전에 워커가 죽은 상황
+        Schedule.objects.all().delete()
+        IdempotencyKey.objects.update(status_code=None, response_data=None)
+
+        response = self.client.post(self.schedule_url, data, HTTP_IDEMPOTENCY_KEY="d")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        response = self.client.post(self.schedule_url, data, HTTP_IDEMPOTENCY_KEY="d")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Schedule.objects.count(), 1)
+        self.assertEqual(IdempotencyKey.objects.get().status_code, 201)
+
+    def test_create_repeating_schedule_blackouts(self):
+        start_date = timezone.now().date()
+        Blackout.objects.create(
+            start_date=start_date + timedelta(weeks=2),
+            end_date=start_date + timedelta(weeks=2, days=2),
+        )
+        Blackout.objects.create(
+            teacher=self.teacher,
+            start_date=start_date + timedelta(weeks=6),
+            end_date=start_date + timedelta(weeks=6),
+        )
+        Blackout.objects.create(
+            teacher=Teacher.objects.create(
+                user_name="teacher2",
+                human_name="Alice",
+                password="password123",
+                subject=self.subject,
+            ),
+            start_date=start_date,
+            end_date=start_date,
+        )
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_id": self.student.id,
+            "start_date": start_date.isoformat(),
+            "end_date": (start_date + timedelta(weeks=8)).isoformat(),
+            "frequency": 2,
+        }
+        url = reverse("schedule-create-repeating")
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            response.data["dates"],
+            [start_date + timedelta(weeks=weeks) for weeks in (0, 4, 8)],
+        )
+
+        Schedule.objects.all().delete()
+        data["blackout_policy"] = "shift"
+        response = self.client.post(url, data)
+        self.assertEqual(
+            response.data["dates"],
+            [
+                start_date,
+                start_date + timedelta(weeks=2, days=3),
+                start_date + timedelta(weeks=4),
+                start_date + timedelta(weeks=6, days=1),
+                start_date + timedelta(weeks=8),
+            ],
+        )
+
+    def test_create_repeating_schedule_all_blacked_out(self):
+        start_date = timezone.now().date()
+        Blackout.objects.create(
+            student=self.student,
+            start_date=start_date,
+            end_date=start_date + timedelta(weeks=4),
+        )
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_id": self.student.id,
+            "start_date": start_date.isoformat(),
+            "end_date": (start_date + timedelta(weeks=4)).isoformat(),
+            "frequency": 2,
+        }
+        url = reverse("schedule-create-repeating")
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("All dates fall on blackout days.", response.data["error"])
+        self.assertFalse(Schedule.objects.exists())
+
+        # 잘못된 정책은 휴강 조회 전에 거절
+        dates = (start_date, start_date, 2)
+        with self.assertNumQueries(0), self.assertRaises(ValidationError):
+            Schedule.create_repeating_schedules(
+                self.teacher.id,
+                self.student.id,
+                self.subject.id,
+                *dates,
+                blackout_policy="move",
+            )
+        with self.assertNumQueries(0), self.assertRaises(ValidationError):
+            Lesson.create_repeating_lessons(
+                self.teacher.id,
+                [self.student.id],
+                self.subject.id,
+                *dates,
+                blackout_policy="move",
+            )
+
+    def test_create_blackout(self):
+        start_date = timezone.now().date()
+        data = {
+            "student": self.student.id,
+            "start_date": start_date.isoformat(),
+            "end_date": (start_date - timedelta(days=1)).isoformat(),
+        }
+        url = reverse("blackout-list")
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        data["end_date"] = start_date.isoformat()
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Blackout.objects.get().teacher, self.teacher)
+
+        response = self.client.get(url)
+        self.assertEqual(len(response.data), 1)
+
+    @override_settings(WRITE_THROTTLE_CAPACITY=2, WRITE_THROTTLE_REFILL_RATE=0.01)
+    def test_write_throttle(self):
+        for days in range(3):
+            data = {
+                "teacher_id": self.teacher.id,
+                "student_id": self.student.id,
+                "scheduled_at": (timezone.now() + timedelta(days=days)).date(),
+            }
+            response = self.client.post(self.schedule_url, data)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+        self.assertEqual(Schedule.objects.count(), 2)
+
+        response = self.client.get(self.schedule_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            get_throttle_metrics()["schedule"]["create"],
+            {"allowed": 2, "throttled": 1, "shed": 0},
+        )
+
+    @override_settings(WRITE_THROTTLE_CAPACITY=5, WRITE_THROTTLE_REFILL_RATE=0.01)
+    def test_write_throttle_idempotent_replay(self):
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_id": self.student.id,
+            "start_date": timezone.now().date().isoformat(),
+            "end_date": (timezone.now() + timedelta(weeks=8)).date().isoformat(),
+            "frequency": 2,
+        }
+        url = reverse("schedule-create-repeating")
+        response = self.client.post(url, data, HTTP_IDEMPOTENCY_KEY="f")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # 토큰을 모두 소모한 뒤에도 재시도에는 저장된 응답을 반환
+        response = self.client.post(url, data, HTTP_IDEMPOTENCY_KEY="f")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response["Idempotent-Replayed"], "true")
+
+        response = self.client.post(url, data, HTTP_IDEMPOTENCY_KEY="g")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_throttle_metrics_requires_shared_cache(self):
+        with self.assertRaises(CommandError):
+            call_command("throttle_metrics")
+
+    @override_settings(HEAVY_ACTION_CONCURRENCY=0)
+    def test_heavy_action_load_shedding(self):
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_id": self.student.id,
+            "start_date": timezone.now().date().isoformat(),
+            "end_date": (timezone.now() + timedelta(weeks=8)).date().isoformat(),
+            "frequency": 2,
+        }
+        url = reverse("schedule-create-repeating")
+        with self.assertLogs("schedules.throttling", "WARNING") as logs:
+            response = self.client.post(url, data, HTTP_IDEMPOTENCY_KEY="c")
+        self.assertEqual(
+            logs.output,
+            [
+                "WARNING:schedules.throttling:"
+                "Shed schedule create_repeating: 0 heavy requests in flight."
+            ],
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(Schedule.objects.count(), 0)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        metrics = get_throttle_metrics()
+        self.assertEqual(metrics["schedule"]["create_repeating"]["shed"], 1)
+        self.assertEqual(metrics["lesson"]["create_repeating"]["shed"], 0)
+
+        with override_settings(HEAVY_ACTION_CONCURRENCY=1):
+            response = self.client.post(url, data, HTTP_IDEMPOTENCY_KEY="c")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @override_settings(HEAVY_ACTION_CONCURRENCY=1)
+    def test_heavy_action_slot_expires_in_flight(self):
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_id": self.student.id,
+            "start_date": timezone.now().date().isoformat(),
+            "end_date": (timezone.now() + timedelta(weeks=8)).date().isoformat(),
+            "frequency": 2,
+        }
+        url = reverse("schedule-create-repeating")
+        slot_key = HEAVY_SLOT_CACHE_KEY.format(0)
+        create_repeating_schedules = Schedule.create_repeating_schedules
+
+        # 처리 중 슬롯이 만료되고 다른 요청이 그 슬롯을 가져간 상황
+        def expire_slot(*args, **kwargs):
+            cache.delete(slot_key)
+            cache.add(slot_key, "other")
+            return create_repeating_schedules(*args, **kwargs)
+
+        with mock.patch.object(
+            Schedule, "create_repeating_schedules", side_effect=expire_slot
+        ):
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(cache.get(slot_key), "other")
+
+        with self.assertLogs("schedules.throttling", "WARNING"):
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        cache.delete(slot_key)
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(cache.get(slot_key))
+
+    def test_list_schedules_without_select_related(self):
+        for days in range(5):
+            Schedule.objects.create(
+                teacher=self.teacher,
+                student=self.student,
+                subject=self.subject,
+                scheduled_at=(timezone.now() + timedelta(days=days)).date(),
+            )
+        response = self.client.get(self.schedule_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with mock.patch.object(
+            ScheduleViewSet, "get_queryset", lambda self: Schedule.objects.all()
+        ):
+            with self.assertRaises(NPlusOneDetected):
+                self.client.get(self.schedule_url)
+
+    def test_query_budget_exceeded(self):
+        class View:
+            @query_budget(1)
+            def get(self, request):
+                return list(Subject.objects.all()) + list(Teacher.objects.all())
+
+        with self.assertRaises(QueryBudgetExceeded):
+            View().get(None)
+
+    def test_record_queries_shapes(self):
+        with record_queries(threshold=2) as recorder:
+            Schedule.objects.filter(id__in=[1, 2]).exists()
+            Schedule.objects.filter(id__in=[1, 2, 3]).exists()
+        self.assertEqual(recorder.count, 2)
+        self.assertEqual(len(recorder.stacks), 1)
+
+
+@override_settings(N_PLUS_ONE_DETECTION="raise", QUERY_BUDGET_ENFORCE=True)
+class LessonViewSetTest(APITestCase):
+
+    def setUp(self):
+        self.subject = Subject.objects.create(korean_name="수학", english_name="Math")
+        self.teacher = Teacher.objects.create(
+            user_name="teacher1",
+            human_name="John Doe",
+            password="password123",
+            subject=self.subject,
+        )
+        self.students = [
+            Student.objects.create(
+                user_name=f"student{i}", human_name=f"Student {i}", password="pw"
+            )
+            for i in range(3)
+        ]
+        self.student_ids = [student.id for student in self.students]
+
+        cache.clear()
+
+        self.token = issue_token(self.teacher)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        get_revoked_token_ids()
+
+    def test_create_lesson(self):
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_ids": self.student_ids,
+            "scheduled_at": (timezone.now() + timedelta(days=7)).date().isoformat(),
+        }
+        response = self.client.post(reverse("lesson-list"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Lesson.objects.count(), 1)
+        self.assertEqual(Schedule.objects.filter(lesson__isnull=False).count(), 3)
+
+    def test_create_repeating_lesson_skips_conflicts(self):
+        start_date = timezone.now().date()
+        Schedule.objects.create(
+            teacher=self.teacher,
+            student=self.students[0],
+            subject=self.subject,
+            scheduled_at=start_date,
+        )
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_ids": self.student_ids,
+            "start_date": start_date.isoformat(),
+            "end_date": (start_date + timedelta(weeks=8)).isoformat(),
+            "frequency": 2,
+        }
+        url = reverse("lesson-create-repeating")
+        with self.assertNumQueries(7):
+            response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        lessons = response.data["lessons"]
+        self.assertEqual(len(lessons), 5)
+        self.assertEqual(lessons[0]["student_ids"], self.student_ids[1:])
+        self.assertEqual(Schedule.objects.count(), 1 + 5 * 3 - 1)
+
+    def test_complete_lesson_attendees(self):
+        lesson = Lesson.create_lesson(
+            self.teacher.id,
+            self.student_ids,
+            self.subject.id,
+            timezone.now().date().isoformat(),
+        )[0]
+        url = reverse("lesson-complete", kwargs={"pk": lesson["id"]})
+        response = self.client.patch(
+            url, {"student_ids": self.student_ids[:2]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+
+        response = self.client.patch(url, format="json")
+        self.assertEqual(response.data["count"], 1)
+        self.assertFalse(Schedule.objects.filter(is_complete=False).exists())
+
+        response = self.client.patch(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_complete_lesson_non_attendees(self):
+        lesson = Lesson.create_lesson(
+            self.teacher.id,
+            self.student_ids[:2],
+            self.subject.id,
+            timezone.now().date().isoformat(),
+        )[0]
+        url = reverse("lesson-complete", kwargs={"pk": lesson["id"]})
+        response = self.client.patch(
+            url, {"student_ids": [self.student_ids[2]]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("not attendees", response.data["error"])
+
+        response = self.client.patch(
+            url, {"student_ids": self.student_ids}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Schedule.objects.filter(is_complete=True).exists())
+
+    def test_retrieve_lesson(self):
+        lesson = Lesson.create_lesson(
+            self.teacher.id,
+            self.student_ids,
+            self.subject.id,
+            timezone.now().date().isoformat(),
+        )[0]
+        url = reverse("lesson-detail", kwargs={"pk": lesson["id"]})
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["attendees"]), 3)
+
+    def test_create_repeating_lesson_student_blackout(self):
+        start_date = timezone.now().date()
+        Blackout.objects.create(
+            student=self.students[1],
+            start_date=start_date,
+            end_date=start_date + timedelta(weeks=3),
+        )
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_ids": self.student_ids,
+            "start_date": start_date.isoformat(),
+            "end_date": (start_date + timedelta(weeks=4)).isoformat(),
+            "frequency": 2,
+        }
+        url = reverse("lesson-create-repeating")
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        lessons = response.data["lessons"]
+        self.assertEqual(len(lessons), 3)
+        self.assertEqual(lessons[0]["student_ids"], self.student_ids[::2])
+        self.assertEqual(lessons[1]["student_ids"], self.student_ids[::2])
+        self.assertEqual(lessons[2]["student_ids"], self.student_ids)
+
+    def test_create_repeating_lesson_all_students_blacked_out(self):
+        start_date = timezone.now().date()
+        for student in self.students:
+            Blackout.objects.create(
+                student=student,
+                start_date=start_date,
+                end_date=start_date + timedelta(weeks=4),
+            )
+        data = {
+            "teacher_id": self.teacher.id,
+            "student_ids": self.student_ids,
+            "start_date": start_date.isoformat(),
+            "end_date": (start_date + timedelta(weeks=4)).isoformat(),
+            "frequency": 2,
+        }
+        url = reverse("lesson-create-repeating")
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("All dates fall on blackout days.", response.data["error"])
+        self.assertFalse(Lesson.objects.exists())
+
+
+class BlackoutCalendarTest(SimpleTestCase):
+
+    def setUp(self):
+        # 5년치 설날/추석 연휴, 여름 방학과 겹치는 구간
+        self.ranges = []
+        for year in range(2025, 2030):
+            self.ranges.append((date(year, 1, 28), date(year, 1, 30)))
+            self.ranges.append((date(year, 7, 20), date(year, 8, 10)))
+            self.ranges.append((date(year, 8, 5), date(year, 8, 20)))
+            self.ranges.append((date(year, 8, 21), date(year, 8, 21)))
+            self.ranges.append((date(year, 9, 16), date(year, 9, 18)))
+        self.calendar = BlackoutCalendar(self.ranges)
+        self.dates = [
+            date(2025, 1, 1) + timedelta(weeks=2 * i) for i in range(5 * 26 + 1)
+        ]
+
+    def is_blacked_out(self, day):
+        return any(start <= day <= end for start, end in self.ranges)
+
+    def test_merges_overlapping_and_adjacent_ranges(self):
+        self.assertEqual(len(self.calendar.starts), 5 * 3)
+        self.assertIn(
+            (date(2027, 7, 20), date(2027, 8, 21)),
+            list(zip(self.calendar.starts, self.calendar.ends)),
+        )
+
+    def test_contains_matches_linear_scan(self):
+        day = date(2025, 1, 1)
+        while day <= date(2029, 12, 31):
+            self.assertEqual(day in self.calendar, self.is_blacked_out(day), day)
+            day += timedelta(days=1)
+
+    def test_skip_multi_year(self):
+        result = self.calendar.apply(self.dates, "skip", self.dates[-1])
+        self.assertEqual(
+            result, [day for day in self.dates if not self.is_blacked_out(day)]
+        )
+
+    def test_shift_multi_year(self):
+        result = self.calendar.apply(self.dates, "shift", self.dates[-1])
+        self.assertEqual(result, sorted(set(result)))
+        self.assertFalse(any(self.is_blacked_out(day) for day in result))
+        for day in self.dates:
+            if self.is_blacked_out(day):
+                self.assertIn(self.calendar.find(day) + timedelta(days=1), result)
+            else:
+                self.assertIn(day, result)
+
+    def test_shift_past_last_date(self):
+        calendar = BlackoutCalendar([(date(2025, 12, 20), date(2026, 1, 5))])
+        result = calendar.apply([date(2025, 12, 24)], "shift", date(2025, 12, 31))
+        self.assertEqual(result, [])
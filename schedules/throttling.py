@@ -0,0 +1,144 @@
+import logging
+import secrets
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+from .authentication import TokenTeacher
+from .constants import (
+    HEAVY_ACTIONS,
+    THROTTLE_DECISIONS,
+    THROTTLED_VIEWSETS,
+    WRITE_ACTIONS,
+)
+from .utils import is_idempotent_replay
+
+logger = logging.getLogger(__name__)
+
+BUCKET_CACHE_KEY = "schedules:throttle:teacher:{}"
+HEAVY_SLOT_CACHE_KEY = "schedules:throttle:heavy-slot:{}"
+METRICS_CACHE_KEY = "schedules:throttle-metrics:{}:{}:{}"
+
+
+# 스로틀 결정(allowed, throttled, shed) 횟수를 viewset, action별로 캐시에 누적
+def record_throttle_decision(basename, action, decision):
+    key = METRICS_CACHE_KEY.format(basename, action, decision)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def get_throttle_metrics():
+    keys = {
+        METRICS_CACHE_KEY.format(basename, action, decision): (
+            basename,
+            action,
+            decision,
+        )
+        for basename in THROTTLED_VIEWSETS
+        for action in WRITE_ACTIONS
+        for decision in THROTTLE_DECISIONS
+    }
+    values = cache.get_many(keys)
+    metrics = {
+        basename: {
+            action: dict.fromkeys(THROTTLE_DECISIONS, 0) for action in WRITE_ACTIONS
+        }
+        for basename in THROTTLED_VIEWSETS
+    }
+    for key, count in values.items():
+        basename, action, decision = keys[key]
+        metrics[basename][action][decision] = count
+    return metrics
+
+
+# 선생님별 토큰 버킷으로 쓰기 action 제한 (무거운 action은 토큰을 더 소모)
+class TeacherWriteThrottle(BaseThrottle):
+    def __init__(self):
+        self.capacity = settings.WRITE_THROTTLE_CAPACITY
+        self.refill_rate = settings.WRITE_THROTTLE_REFILL_RATE
+        self.wait_time = None
+
+    def allow_request(self, request, view):
+        if view.action not in WRITE_ACTIONS or not isinstance(
+            request.user, TokenTeacher
+        ):
+            return True
+
+        # 저장된 응답을 돌려주는 Idempotency-Key 재시도는 토큰을 소모하지 않음
+        if is_idempotent_replay(request, request.user.id):
+            record_throttle_decision(view.basename, view.action, "allowed")
+            return True
+
+        cost = settings.HEAVY_ACTION_COST if view.action in HEAVY_ACTIONS else 1
+        key = BUCKET_CACHE_KEY.format(request.user.id)
+        now = time.time()
+
+        # 캐시 get/set 사이의 경합은 허용 (근사치 제한)
+        tokens, updated_at = cache.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.refill_rate)
+        if tokens < cost:
+            self.wait_time = (cost - tokens) / self.refill_rate
+            record_throttle_decision(view.basename, view.action, "throttled")
+            logger.info(
+                "Throttled %s for teacher %s (retry after %.1fs).",
+                view.action,
+                request.user.id,
+                self.wait_time,
+            )
+            return False
+
+        cache.set(
+            key, (tokens - cost, now), timeout=int(self.capacity / self.refill_rate) + 1
+        )
+        record_throttle_decision(view.basename, view.action, "allowed")
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+# 무거운 action의 동시 실행 슬롯 확보 (슬롯마다 별도 키와 만료 시간을 두어
+# 중단된 요청의 슬롯은 HEAVY_ACTION_SLOT_TIMEOUT 후 자동으로 반환됨)
+def acquire_heavy_slot():
+    holder = secrets.token_urlsafe(8)
+    for slot in range(settings.HEAVY_ACTION_CONCURRENCY):
+        key = HEAVY_SLOT_CACHE_KEY.format(slot)
+        if cache.add(key, holder, timeout=settings.HEAVY_ACTION_SLOT_TIMEOUT):
+            return key, holder
+    return None
+
+
+def release_heavy_slot(key, holder):
+    # 만료 후 다른 요청이 가져간 슬롯은 반환하지 않음
+    if cache.get(key) == holder:
+        cache.delete(key)
+
+
+# 무거운 action의 전체 동시 실행 수 제한, 초과 시 429와 Retry-After로 거절
+def shed_load(view_func):
+    @wraps(view_func)
+    def _wrapped_view(self, request, *args, **kwargs):
+        slot = acquire_heavy_slot()
+        if slot is None:
+            record_throttle_decision(self.basename, self.action, "shed")
+            logger.warning(
+                "Shed %s %s: %s heavy requests in flight.",
+                self.basename,
+                self.action,
+                settings.HEAVY_ACTION_CONCURRENCY,
+            )
+            raise Throttled(wait=settings.HEAVY_ACTION_RETRY_AFTER)
+
+        try:
+            return view_func(self, request, *args, **kwargs)
+        finally:
+            release_heavy_slot(*slot)
+
+    return _wrapped_view
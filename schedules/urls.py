@@ -1,10 +1,20 @@
+from django.conf import settings
 from django.urls import include, path
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import DefaultRouter, SimpleRouter
 
-from .views import ScheduleViewSet
+from .views import BlackoutViewSet, LessonViewSet, ScheduleViewSet
 
-router = DefaultRouter()
+# API 루트 페이지는 browsable API를 쓰는 설정에서만 제공
+if (
+    "rest_framework.renderers.BrowsableAPIRenderer"
+    in settings.REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"]
+):
+    router = DefaultRouter()
+else:
+    router = SimpleRouter()
 router.register(r"schedules", ScheduleViewSet)
+router.register(r"lessons", LessonViewSet)
+router.register(r"blackouts", BlackoutViewSet)
 
 urlpatterns = [
     path("", include(router.urls)),
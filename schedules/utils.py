@@ -1,34 +1,166 @@
+import hashlib
+import json
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
 from functools import wraps
 
-from rest_framework.exceptions import PermissionDenied, ValidationError
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import NotAuthenticated, ValidationError
+from rest_framework.response import Response
 
-from .models import Teacher
+from .authentication import TokenTeacher
+from .models import IdempotencyKey
 
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
 
-# 유저 확인 함수
-def get_current_teacher(request):
-    teacher_id = request.headers.get("Teacher-ID")
-    if not teacher_id:
-        raise ValidationError({"error": "Teacher-ID header is required."})
 
-    try:
-        return Teacher.objects.select_related("subject").get(id=teacher_id)
-    except Teacher.DoesNotExist:
-        raise ValidationError({"error": "Invalid Teacher-ID."})
+# 유저 확인 함수 (토큰 인증으로 복원한 선생님 정보, DB 조회 없음)
+def get_current_teacher(request):
+    if not isinstance(request.user, TokenTeacher):
+        raise NotAuthenticated({"error": "Authentication token is required."})
+    return request.user
 
 
-def teacher_permission_required(view_func):
+# 요청 데이터에서 id 목록 추출 (중복 제거, 순서 유지)
+def get_id_list(data, key):
+    values = data.getlist(key) if hasattr(data, "getlist") else data.get(key)
+    if not isinstance(values, list) or not values:
+        raise ValidationError(f"{key} must be a non-empty list.")
+    try:
+        return list(dict.fromkeys(int(value) for value in values))
+    except (TypeError, ValueError):
+        raise ValidationError(f"{key} must be a list of integers.")
+
+
+# Idempotency-Key 헤더가 있으면 첫 응답을 저장해두고 재시도 요청에는 저장된 응답을 반환
+# 스로틀과 idempotent 데코레이터가 저장된 키를 요청당 한 번만 조회하도록 요청에 보관
+def get_stored_idempotency_key(request, teacher_id, key):
+    if not hasattr(request, "stored_idempotency_key"):
+        request.stored_idempotency_key = IdempotencyKey.objects.filter(
+            teacher_id=teacher_id, key=key
+        ).first()
+    return request.stored_idempotency_key
+
+
+# 저장된 응답을 그대로 돌려줄 재시도 요청인지 확인
+def is_idempotent_replay(request, teacher_id):
+    key = request.headers.get("Idempotency-Key")
+    if not key:
+        return False
+    stored = get_stored_idempotency_key(request, teacher_id, key)
+    return (
+        stored is not None
+        and stored.status_code is not None
+        and stored.created_at
+        >= timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    )
+
+
+def idempotent(view_func):
     @wraps(view_func)
     def _wrapped_view(self, request, *args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if not key:
+            return view_func(self, request, *args, **kwargs)
+        if len(key) > 255:
+            raise ValidationError({"error": "Idempotency-Key is too long."})
+
         current_teacher = get_current_teacher(request)
-        schedule = self.get_object()
+        request_hash = hashlib.sha256(
+            json.dumps(
+                [request.path, request.data], sort_keys=True, default=str
+            ).encode()
+        ).hexdigest()
+
+        in_progress = Response(
+            {"error": "A request with this Idempotency-Key is in progress."},
+            status=status.HTTP_409_CONFLICT,
+        )
+        now = timezone.now()
+        stored = get_stored_idempotency_key(request, current_teacher.id, key)
+        if stored is not None and stored.created_at < now - timedelta(
+            seconds=settings.IDEMPOTENCY_KEY_TTL
+        ):
+            stored.delete()
+            stored = None
+
+        if stored is None:
+            try:
+                with transaction.atomic():
+                    stored = IdempotencyKey.objects.create(
+                        teacher_id=current_teacher.id,
+                        key=key,
+                        request_hash=request_hash,
+                    )
+            except IntegrityError:
+                return in_progress
+        elif stored.request_hash != request_hash:
+            return Response(
+                {"error": "Idempotency-Key was used with a different request."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        elif stored.status_code is not None:
+            return Response(
+                stored.response_data,
+                status=stored.status_code,
+                headers={"Idempotent-Replayed": "true"},
+            )
+        elif stored.created_at < now - timedelta(
+            seconds=settings.IDEMPOTENCY_KEY_LEASE
+        ):
+            # 처리 중 워커가 죽어 남은 선점은 lease가 지나면 다시 가져감
+            reclaimed = IdempotencyKey.objects.filter(
+                id=stored.id, status_code__isnull=True, created_at=stored.created_at
+            ).update(created_at=now)
+            if not reclaimed:
+                return in_progress
+        else:
+            return in_progress
+
+        try:
+            response = view_func(self, request, *args, **kwargs)
+        except Exception:
+            stored.delete()
+            raise
+
+        # 서버 오류는 저장하지 않고 재시도를 허용
+        if response.status_code >= 500:
+            stored.delete()
+        else:
+            stored.status_code = response.status_code
+            stored.response_data = response.data
+            stored.save(update_fields=["status_code", "response_data"])
+        return response
+
+    return _wrapped_view
 
-        if schedule.teacher != current_teacher:
-            raise PermissionDenied({"error": "Permission denied"})
 
-        return view_func(self, request, schedule=schedule, *args, **kwargs)
+# ETag 관련 함수 (modified_at 기반)
+def make_etag(modified_at):
+    microseconds = (modified_at - EPOCH) // timedelta(microseconds=1)
+    return f'"{microseconds}"'
 
-    return _wrapped_view
+
+# If-Match 헤더를 modified_at 목록으로 변환 (헤더가 없거나 "*"이면 None)
+def get_if_match_versions(request):
+    if_match = request.headers.get("If-Match")
+    if not if_match or if_match.strip() == "*":
+        return None
+
+    versions = []
+    for etag in if_match.split(","):
+        etag = etag.strip()
+        # If-Match는 strong 비교만 허용하므로 weak ETag는 일치하지 않는 것으로 처리
+        if etag.startswith("W/") or not (etag.startswith('"') and etag.endswith('"')):
+            continue
+        try:
+            versions.append(EPOCH + timedelta(microseconds=int(etag[1:-1])))
+        except (ValueError, OverflowError):
+            continue
+    return versions
 
 
 # 데이터 가공 함수
@@ -52,3 +184,14 @@ def filter_by_date_range(queryset, date_from=None, date_to=None):
 def filter_by_completion_status(queryset, is_complete):
     queryset = queryset.filter(is_complete=is_complete.lower() == "true")
     return queryset
+
+
+# 여러 조회를 하나의 트랜잭션 스냅샷에서 실행
+@contextmanager
+def snapshot_transaction():
+    outermost = not connection.in_atomic_block
+    with transaction.atomic():
+        if outermost and connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        yield
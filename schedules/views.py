@@ -1,25 +1,42 @@
-from django.db.models import Count
+from copy import copy
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connection
+from django.db.models import Count, Prefetch
+from django.http import QueryDict
 from django.utils import timezone
-from rest_framework import status, viewsets
+from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 
-from .models import Schedule
-from .serializers import ScheduleSerializer
+from .constants import BATCH_ACTIONS, BATCH_MAX_REQUESTS
+from .models import Blackout, Lesson, Schedule
+from .queries import query_budget, separate_query_shapes
+from .serializers import BlackoutSerializer, LessonSerializer, ScheduleSerializer
+from .throttling import TeacherWriteThrottle, shed_load
 from .utils import (
     filter_by_completion_status,
     filter_by_date_range,
     filter_by_teacher,
     get_current_teacher,
-    teacher_permission_required,
+    get_id_list,
+    get_if_match_versions,
+    idempotent,
+    make_etag,
+    snapshot_transaction,
 )
 
 
 class ScheduleViewSet(viewsets.ModelViewSet):
     queryset = Schedule.objects.all()
     serializer_class = ScheduleSerializer
+    throttle_classes = [TeacherWriteThrottle]
+    lookup_value_regex = r"\d+"
+    batch_objects = None
 
+    @idempotent
+    @query_budget(2)
     def create(self, request, *args, **kwargs):
         teacher_id = int(request.data.get("teacher_id"))
         student_id = int(request.data.get("student_id"))
@@ -27,7 +44,7 @@ class ScheduleViewSet(viewsets.ModelViewSet):
 
         current_teacher = get_current_teacher(request)
         current_teacher_id = current_teacher.id
-        subject_id = current_teacher.subject.id
+        subject_id = current_teacher.subject_id
         if current_teacher_id != teacher_id:
             return Response(
                 {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
@@ -45,6 +62,9 @@ class ScheduleViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED,
         )
 
+    @idempotent
+    @shed_load
+    @query_budget(3)
     @action(detail=False, methods=["post"], url_path="create-repeating")
     def create_repeating(self, request):
         teacher_id = int(request.data.get("teacher_id"))
@@ -52,10 +72,11 @@ class ScheduleViewSet(viewsets.ModelViewSet):
         start_date = request.data.get("start_date")
         end_date = request.data.get("end_date")
         frequency = int(request.data.get("frequency"))
+        blackout_policy = request.data.get("blackout_policy", "skip")
 
         current_teacher = get_current_teacher(request)
         current_teacher_id = current_teacher.id
-        subject_id = current_teacher.subject.id
+        subject_id = current_teacher.subject_id
         if current_teacher_id != teacher_id:
             return Response(
                 {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
@@ -63,7 +84,13 @@ class ScheduleViewSet(viewsets.ModelViewSet):
 
         try:
             created_schedules = Schedule.create_repeating_schedules(
-                teacher_id, student_id, subject_id, start_date, end_date, frequency
+                teacher_id,
+                student_id,
+                subject_id,
+                start_date,
+                end_date,
+                frequency,
+                blackout_policy,
             )
         except ValidationError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -73,13 +100,20 @@ class ScheduleViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED,
         )
 
+    @query_budget(1)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def get_base_queryset(self):
+        return Schedule.objects.select_related("teacher", "student", "subject")
+
     def get_queryset(self):
         teacher_id = self.request.query_params.get("teacher_id")
         date_from = self.request.query_params.get("date_from")
         date_to = self.request.query_params.get("date_to")
         is_complete = self.request.query_params.get("is_complete")
 
-        queryset = Schedule.objects.select_related("teacher", "student", "subject")
+        queryset = self.get_base_queryset()
 
         if teacher_id:
             queryset = filter_by_teacher(queryset, teacher_id)
@@ -90,6 +124,7 @@ class ScheduleViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    @query_budget(1)
     @action(detail=False, methods=["get"])
     def dashboard(self, request):
         current_teacher = get_current_teacher(request)
@@ -98,7 +133,7 @@ class ScheduleViewSet(viewsets.ModelViewSet):
 
         schedules = (
             Schedule.objects.filter(
-                teacher=current_teacher,
+                teacher_id=current_teacher.id,
                 scheduled_at__year=year,
                 scheduled_at__month=month,
             )
@@ -114,21 +149,273 @@ class ScheduleViewSet(viewsets.ModelViewSet):
             }
         )
 
-    @teacher_permission_required
+    # 배치 요청에서는 미리 한 번에 조회해둔 스케줄 사용
+    def get_object(self):
+        if self.batch_objects is None:
+            return super().get_object()
+
+        schedule = self.batch_objects.get(int(self.kwargs["pk"]))
+        if schedule is None:
+            raise NotFound({"error": "Schedule not found."})
+        self.check_object_permissions(self.request, schedule)
+        return schedule
+
+    @query_budget(1)
+    def retrieve(self, request, *args, **kwargs):
+        schedule = self.get_object()
+        serializer = self.get_serializer(schedule)
+        return Response(
+            serializer.data, headers={"ETag": make_etag(schedule.modified_at)}
+        )
+
+    @query_budget(2)
     @action(detail=True, methods=["patch"])
-    def complete(self, request, schedule=None, pk=None):
+    def complete(self, request, pk=None):
+        current_teacher = get_current_teacher(request)
+        versions = get_if_match_versions(request)
+
         try:
-            schedule.mark_as_complete()
+            completed_at = Schedule.complete_schedule(
+                int(pk), current_teacher.id, versions
+            )
         except ValidationError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({"status": "Schedule marked as complete"})
+        return Response(
+            {"status": "Schedule marked as complete"},
+            headers={"ETag": make_etag(completed_at)},
+        )
+
+    @query_budget(2)
+    def destroy(self, request, pk=None, *args, **kwargs):
+        current_teacher = get_current_teacher(request)
+        versions = get_if_match_versions(request)
 
-    @teacher_permission_required
-    def destroy(self, request, schedule=None, *args, **kwargs):
         try:
-            schedule.delete_schedule()
+            Schedule.delete_schedule(int(pk), current_teacher.id, versions)
         except ValidationError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=["post"])
+    def batch(self, request):
+        sub_requests = request.data.get("requests")
+        if not isinstance(sub_requests, list) or not sub_requests:
+            return Response(
+                {"error": "Requests must be a non-empty list."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(sub_requests) > BATCH_MAX_REQUESTS:
+            return Response(
+                {"error": f"Cannot batch more than {BATCH_MAX_REQUESTS} requests."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        get_current_teacher(request)
+
+        # pk 범위를 벗어난 id는 조회하지 않고 해당 하위 요청만 404로 처리
+        min_id, max_id = connection.ops.integer_field_range(
+            Schedule._meta.pk.get_internal_type()
+        )
+        retrieve_ids = {
+            sub_request["id"]
+            for sub_request in sub_requests
+            if isinstance(sub_request, dict)
+            and sub_request.get("action") == "retrieve"
+            and type(sub_request.get("id")) is int
+            and min_id <= sub_request["id"] <= max_id
+        }
+
+        with snapshot_transaction():
+            batch_objects = (
+                self.get_base_queryset().in_bulk(retrieve_ids) if retrieve_ids else {}
+            )
+            responses = []
+            for sub_request in sub_requests:
+                # 하위 요청마다 같은 형태의 쿼리가 실행되는 것은 N+1이 아님
+                with separate_query_shapes():
+                    responses.append(
+                        self.run_sub_request(request, sub_request, batch_objects)
+                    )
+
+        return Response({"responses": responses})
+
+    def run_sub_request(self, request, sub_request, batch_objects):
+        if not isinstance(sub_request, dict):
+            sub_request = {}
+        action_name = sub_request.get("action")
+        params = sub_request.get("params") or {}
+        if action_name not in BATCH_ACTIONS or not isinstance(params, dict):
+            return {
+                "status": status.HTTP_400_BAD_REQUEST,
+                "data": {"error": "Invalid batch request."},
+            }
+
+        kwargs = {}
+        if action_name == "retrieve":
+            if type(sub_request.get("id")) is not int:
+                return {
+                    "status": status.HTTP_400_BAD_REQUEST,
+                    "data": {"error": "Invalid batch request."},
+                }
+            kwargs["pk"] = str(sub_request["id"])
+
+        # 상위 요청에서 인증된 선생님 정보를 그대로 사용하는 GET 하위 요청 생성
+        http_request = copy(request._request)
+        http_request.method = "GET"
+        http_request.GET = QueryDict(mutable=True)
+        for key, value in params.items():
+            http_request.GET[key] = str(value)
+
+        view = self.__class__(
+            action_map={"get": action_name},
+            basename=self.basename,
+            detail=action_name == "retrieve",
+            format_kwarg=None,
+            args=(),
+            kwargs=kwargs,
+            headers={},
+            batch_objects=batch_objects,
+        )
+        view.request = view.initialize_request(http_request)
+        view.request.user = request.user
+        view.request.auth = request.auth
+
+        try:
+            view.initial(view.request)
+            response = getattr(view, action_name)(view.request, **kwargs)
+        except (DjangoValidationError, ValueError) as e:
+            # 잘못된 파라미터(날짜 형식 등)는 배치 전체가 아닌 해당 하위 요청만 실패 처리
+            return {"status": status.HTTP_400_BAD_REQUEST, "data": {"error": str(e)}}
+        except Exception as exc:
+            response = view.handle_exception(exc)
+
+        result = {"status": response.status_code, "data": response.data}
+        if response.has_header("ETag"):
+            result["etag"] = response["ETag"]
+        return result
+
+
+class LessonViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    queryset = Lesson.objects.select_related("teacher", "subject").prefetch_related(
+        Prefetch("attendees", queryset=Schedule.objects.select_related("student"))
+    )
+    serializer_class = LessonSerializer
+    throttle_classes = [TeacherWriteThrottle]
+    lookup_value_regex = r"\d+"
+
+    @query_budget(2)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @idempotent
+    @query_budget(4)
+    def create(self, request, *args, **kwargs):
+        teacher_id = int(request.data.get("teacher_id"))
+        scheduled_at = request.data.get("scheduled_at")
+
+        current_teacher = get_current_teacher(request)
+        if current_teacher.id != teacher_id:
+            return Response(
+                {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            student_ids = get_id_list(request.data, "student_ids")
+            created_lessons = Lesson.create_lesson(
+                teacher_id, student_ids, current_teacher.subject_id, scheduled_at
+            )
+        except ValidationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {"status": "Lesson created", "lessons": created_lessons},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @idempotent
+    @shed_load
+    @query_budget(6)
+    @action(detail=False, methods=["post"], url_path="create-repeating")
+    def create_repeating(self, request):
+        teacher_id = int(request.data.get("teacher_id"))
+        start_date = request.data.get("start_date")
+        end_date = request.data.get("end_date")
+        frequency = int(request.data.get("frequency"))
+        blackout_policy = request.data.get("blackout_policy", "skip")
+
+        current_teacher = get_current_teacher(request)
+        if current_teacher.id != teacher_id:
+            return Response(
+                {"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            student_ids = get_id_list(request.data, "student_ids")
+            created_lessons = Lesson.create_repeating_lessons(
+                teacher_id,
+                student_ids,
+                current_teacher.subject_id,
+                start_date,
+                end_date,
+                frequency,
+                blackout_policy,
+            )
+        except ValidationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {"status": "Lessons created", "lessons": created_lessons},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @query_budget(3)
+    @action(detail=True, methods=["patch"])
+    def complete(self, request, pk=None):
+        current_teacher = get_current_teacher(request)
+
+        try:
+            student_ids = None
+            if "student_ids" in request.data:
+                student_ids = get_id_list(request.data, "student_ids")
+            completed = Lesson.complete_attendees(
+                int(pk), current_teacher.id, student_ids
+            )
+        except ValidationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"status": "Attendees marked as complete", "count": completed})
+
+
+class BlackoutViewSet(
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = Blackout.objects.all()
+    serializer_class = BlackoutSerializer
+    lookup_value_regex = r"\d+"
+
+    # 선생님 본인의 휴강만 조회/등록/삭제 (전체 휴강은 운영자가 직접 등록)
+    def get_queryset(self):
+        current_teacher = get_current_teacher(self.request)
+        return Blackout.objects.filter(teacher_id=current_teacher.id).order_by(
+            "start_date"
+        )
+
+    def perform_create(self, serializer):
+        serializer.save(teacher_id=get_current_teacher(self.request).id)
+
+    @query_budget(1)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @query_budget(2)
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @query_budget(2)
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)